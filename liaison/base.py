@@ -1,16 +1,18 @@
 from .companion import Companion
+from .util import lazy_import
 from pathlib import Path
+import collections
+import functools
 import json
-import jsonschema
 
+fastjsonschema = lazy_import("fastjsonschema")
 
-class BaseLiaison:
 
-    command_schema = json.loads(
-        (Path(__file__).parent / "companion" / "command.schema.json").read_text()
-    )
+class BaseLiaison:
+    # maximum number of messages to keep, oldest are discarded first
+    MAX_MESSAGES = 10000
 
-    def __init__(self, companion:Companion=None):
+    def __init__(self, companion:Companion=None, strict=False, record_messages=False):
         # make a companion if none given
         if companion is None:
             companion = Companion()
@@ -18,19 +20,70 @@ class BaseLiaison:
         self.companion = companion
         # store ref to self in companion
         companion.namespace['liaison'] = self
-        # array for messages
-        self.messages = []
+        # store lookup function for commands, to save looking it up on every command
+        self._dispatch = companion.commands.get
+        # should commands be validated against the full schema? (useful for debugging)
+        self.strict = strict
+        # should received messages be stored? (off by default, as nothing reads them back)
+        self.record_messages = record_messages
+        # array for messages (bounded, so a long-running liaison doesn't grow forever)
+        self.messages = collections.deque(maxlen=self.MAX_MESSAGES)
+    
+    @classmethod
+    @functools.cache
+    def _load_command_schema(cls):
+        """
+        Load the schema describing a valid command (once, on first use).
+        """
+        # json can parse bytes directly, so no need to decode the file first
+        return json.loads(
+            Path(__file__).parent.joinpath("companion", "command.schema.json").read_bytes()
+        )
+    
+    @classmethod
+    @functools.cache
+    def _compile_command_validator(cls):
+        """
+        Compile a validation function for the command schema (once, on first use).
+        """
+        return fastjsonschema.compile(cls._load_command_schema())
+    
+    @property
+    def command_schema(self):
+        """
+        Schema describing a valid command, loaded on first use.
+        """
+        return self._load_command_schema()
+    
+    @property
+    def command_validator(self):
+        """
+        Validation function for `command_schema`, compiled on first use.
+        """
+        return self._compile_command_validator()
     
     def process_command(self, command):
+        # if strict, validate against the schema before doing anything
+        if self.strict:
+            try:
+                self.command_validator(command)
+            except fastjsonschema.JsonSchemaException:
+                return
         # if not a valid command, do nothing
-        try:
-            jsonschema.validate(command, self.command_schema)
-        except jsonschema.exceptions.ValidationError:
+        if not isinstance(command, dict):
+            return
+        name = command.get('command')
+        if not isinstance(name, str):
             return
-        # get args
-        args = command.get('args', [])
-        kwargs = command.get('kwargs', {})
         # get method from command name
-        command = self.companion.commands[command['command']]
-        # call
-        return command(*args, **kwargs)
\ No newline at end of file
+        fcn = self._dispatch(name)
+        if fcn is None:
+            return
+        # get args
+        args = command.get('args') or ()
+        kwargs = command.get('kwargs') or {}
+        if not isinstance(args, (list, tuple)) or not isinstance(kwargs, dict):
+            return
+        # call, caching resolved values for the duration of the command
+        with self.companion.cache_resolved():
+            return fcn(*args, **kwargs)
\ No newline at end of file
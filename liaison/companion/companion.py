@@ -1,5 +1,8 @@
+import contextlib
+import functools
 import importlib
 import re
+import threading
 
 
 RE_IMPORT_STRING = re.compile(
@@ -8,10 +11,34 @@ RE_IMPORT_STRING = re.compile(
 RE_RESOLVE_STRING = re.compile(
     r"^\$([\w\d_]+)(\.[\w\d_]+)*$"
 )
+RE_ATTRIBUTE_STRING = re.compile(
+    r"^([\w\d_]+)(\.[\w\d_]+)*$"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_target(target):
+    """
+    Compile a target string which can't be resolved as a plain attribute path (e.g. one containing 
+    subscripts), so that repeat requests for it don't need to be parsed again.
+
+    Parameters
+    ----------
+    target : str
+        Python expression to compile
+    
+    Returns
+    -------
+    code
+        Compiled code object, to be passed to `eval`
+    """
+    return compile(target, "<resolve>", "eval")
 
 
 class Companion:
 
+    __slots__ = ("namespace", "commands", "_local")
+
     def __init__(self):
         # create a namespace to evaluate commands in
         self.namespace = {
@@ -28,11 +55,15 @@ class Companion:
             'store': self.store,
             'ping': self.ping
         }
+        # per-thread state, holds the cache of resolved targets while a command is processed
+        self._local = threading.local()
     
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def resolve_import(target):
         """
-        Resolve an element from a valid import string (e.g. `numpy.random:randint`)
+        Resolve an element from a valid import string (e.g. `numpy.random:randint`). Results are 
+        cached, so repeat imports of the same target return the same object without re-importing.
 
         Parameters
         ----------
@@ -67,7 +98,7 @@ class Companion:
         
         return element
     
-    def actualize(self, arg):
+    def actualize(self, arg, _match=RE_RESOLVE_STRING.fullmatch):
         """
         Work out whether a value needs to be resolved and, if so, resolve it. If not, returns the 
         value unchanged.
@@ -77,10 +108,14 @@ class Companion:
         arg : any
             Value to resolve
         """
-        if isinstance(arg, str) and RE_RESOLVE_STRING.fullmatch(arg):
-            return self.resolve(arg[1:])
-        else:
-            return arg
+        # only strings starting with $ can be references, so check that before using the regex
+        if type(arg) is str and arg[:1] == "$":
+            match = _match(arg)
+            if match:
+                # regex has already found the root name, so no need to look for it again
+                return self._resolve(arg[1:], match.group(1))
+        
+        return arg
     
     def resolve(self, target):
         """
@@ -91,8 +126,50 @@ class Companion:
         target : str
             A string of attribute/key references starting with a name in this Companion's namespace
         """
-        if target.split(".")[0] in self.namespace:
-            return eval(target, self.namespace)
+        return self._resolve(target, target.partition(".")[0])
+    
+    def _resolve(self, target, root):
+        """
+        Resolve a target string whose root name (the part before the first `.`) is already known.
+        """
+        # if processing a command, use values already resolved for it
+        cache = getattr(self._local, "resolve_cache", None)
+        if cache is not None:
+            if target in cache:
+                return cache[target]
+            value = cache[target] = self._resolve_uncached(target, root)
+            return value
+        
+        return self._resolve_uncached(target, root)
+    
+    @contextlib.contextmanager
+    def cache_resolved(self):
+        """
+        Context within which each target resolved on this thread is cached, so that references 
+        repeated within a single command are only resolved once. On exit, any cache from an outer 
+        context is restored.
+        """
+        outer_cache = getattr(self._local, "resolve_cache", None)
+        self._local.resolve_cache = {}
+        try:
+            yield
+        finally:
+            self._local.resolve_cache = outer_cache
+    
+    def _resolve_uncached(self, target, root):
+        """
+        Resolve a target string as in `_resolve`, without checking the cache.
+        """
+        if root in self.namespace:
+            # if target is just a chain of attributes, walk it rather than evaluating
+            if RE_ATTRIBUTE_STRING.fullmatch(target):
+                parts = target.split(".")
+                obj = self.namespace[parts[0]]
+                for part in parts[1:]:
+                    obj = getattr(obj, part)
+                return obj
+            # otherwise, evaluate it
+            return eval(compile_target(target), self.namespace)
         else:
             return self.resolve_import(target)
     
@@ -163,10 +240,17 @@ class Companion:
         any
             Output from the function
         """
-        return self.resolve(fcn)(
-            *[self.actualize(arg) for arg in args], 
-            **{self.actualize(key): self.actualize(arg) for key, arg in kwargs.items()}
-        )
+        act = self.actualize
+        # actualize args (into a tuple, as that's what the call needs anyway)
+        new_args = tuple(map(act, args))
+        # actualize kwargs (keys only need actualizing if they start with $)
+        new_kwargs = {}
+        for key, arg in kwargs.items():
+            if key.startswith("$"):
+                key = act(key)
+            new_kwargs[key] = act(arg)
+
+        return self.resolve(fcn)(*new_args, **new_kwargs)
     
     def attempt(self, fcn, *args, **kwargs):
         """
@@ -1,2 +1,4 @@
 START_MARKER = "LIAISON:CONNECTED"
-STOP_MARKER = "LIAISON:DISCONNECTED"
\ No newline at end of file
+STOP_MARKER = "LIAISON:DISCONNECTED"
+RESPONSE_TAG = "response"
+ERROR_TAG = "error"
\ No newline at end of file
@@ -0,0 +1,34 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Import a module such that it isn't actually loaded until one of its attributes is first 
+    accessed, so that heavy dependencies don't slow down importing Liaison.
+
+    Parameters
+    ----------
+    name : str
+        Name of the module to import
+
+    Returns
+    -------
+    module
+        The module, which will be loaded on first attribute access
+    """
+    # if already imported, just return it
+    if name in sys.modules:
+        return sys.modules[name]
+    # find the module without loading it, so a missing module still errors on import
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    # wrap its loader so that loading waits until first attribute access
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
@@ -17,10 +17,38 @@ parser.add_argument(
     )
 )
 
+parser.add_argument(
+    "--strict",
+    action="store_true",
+    help=(
+        "Validate every command against the full command schema (useful for debugging)"
+    )
+)
+
+parser.add_argument(
+    "--record-messages",
+    action="store_true",
+    help=(
+        "Store every message received, rather than discarding them once processed"
+    )
+)
+
+parser.add_argument(
+    "--threaded",
+    action="store_true",
+    help=(
+        "Process commands on a worker thread, so slow commands don't hold up receiving messages "
+        "(commands will not run on the main thread)"
+    )
+)
+
 args = parser.parse_args()
 
 
 # create and start a websocket liaison
 WebsocketLiaison(
-    *args.address.split(":")
+    *args.address.split(":"),
+    strict=args.strict,
+    record_messages=args.record_messages,
+    threaded=args.threaded
 ).start()
\ No newline at end of file
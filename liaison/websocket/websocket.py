@@ -1,12 +1,97 @@
 import sys
 import asyncio
-import websockets
 import json
+import logging
 import traceback
 import types
-from websockets.sync.client import connect
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from ..base import BaseLiaison
-from ..constants import START_MARKER, STOP_MARKER
+from ..util import lazy_import
+from ..constants import START_MARKER, STOP_MARKER, RESPONSE_TAG, ERROR_TAG
+
+websockets = lazy_import("websockets")
+
+LOG = logging.getLogger(__name__)
+
+# use uvloop for the event loop if available, as it's faster than asyncio's default
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def _module_to_json(o):
+    # construct an import string for a module
+    return f"python:///{o.__name__}"
+
+
+def _callable_to_json(o):
+    # construct an import string for a class or method
+    return f"python:///{o.__module__}:{o.__qualname__}"
+
+
+def _error_to_json(o):
+    # format an error with traceback
+    return traceback.format_exception(o, o, o.__traceback__)
+
+
+def _get_converter(cls):
+    """
+    Work out how to convert objects of a given type (which don't have a working `getJSON` method) 
+    into something which can be JSONified.
+
+    Parameters
+    ----------
+    cls : type
+        Type of the objects to convert
+
+    Returns
+    -------
+    callable
+        Function taking an object of the given type and returning something JSONifiable
+    """
+    if issubclass(cls, types.ModuleType):
+        return _module_to_json
+    if issubclass(cls, (type, types.FunctionType)):
+        return _callable_to_json
+    if issubclass(cls, Exception):
+        return _error_to_json
+    # treat subclasses of tuple or float (e.g. a namedtuple) like json would
+    if issubclass(cls, tuple):
+        return list
+    if issubclass(cls, float):
+        return float
+    
+    return str
+
+
+# cache of converters from _get_converter, by type
+_converters = {}
+
+
+def _liaison_default(o):
+    """
+    Convert an object which can't be JSONified as-is into something which can, by calling its 
+    `getJSON` method (if it has one), constructing an import string or, failing all else, 
+    converting it to a string. How to convert each type without `getJSON` is worked out once and 
+    then cached.
+    """
+    try:
+        # if object has a getJSON method, use it
+        getJSON = getattr(o, "getJSON", None)
+        if getJSON is not None:
+            return getJSON()
+    except:
+        # if there's an error in the getJSON method, continue so we can try regular encoding
+        pass
+    # get converter for this type
+    cls = type(o)
+    converter = _converters.get(cls)
+    if converter is None:
+        converter = _converters[cls] = _get_converter(cls)
+    
+    return converter(o)
 
 
 class LiaisonJSONEncoder(json.JSONEncoder):
@@ -15,33 +100,47 @@ class LiaisonJSONEncoder(json.JSONEncoder):
     string before JSONifying.
     """
     def default(self, o):
-        try:
-            # if object has a getJSON method, use it
-            if hasattr(o, "getJSON"):
-                return o.getJSON()
-        except:
-            # if there's an error in the getJSON method, continue so we can try regular encoding
-            pass
-        # if given a module, construct an import string
-        if isinstance(o, types.ModuleType):
-            return f"python:///{o.__name__}"
-        # if given a class or method, construct an import string
-        if isinstance(o, (type, types.FunctionType)):
-            return f"python:///{o.__module__}:{o.__qualname__}"
-        # if given an error, format it with traceback
-        if isinstance(o, Exception):
-            return traceback.format_exception(o, o, o.__traceback__)
-
-        # otherwise behave as normal
-        try:
-            return json.JSONEncoder.default(self, o=o)
-        except TypeError:
-            return str(o)
+        return _liaison_default(o)
+
+
+# encoder to reuse, rather than creating a new one for each message
+_ENCODER = LiaisonJSONEncoder()
+# options for orjson - pass dataclasses and datetimes to _liaison_default like json would
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+)
 
 
 class WebsocketLiaison(BaseLiaison):
-    def __init__(self, host="localhost", port="8001", companion=None):
-        BaseLiaison.__init__(self, companion)
+    # maximum number of messages (or responses) to queue before waiting for them to be handled
+    MAX_QUEUE = 1024
+
+    def __init__(
+        self, host="localhost", port="8001", companion=None, strict=False, record_messages=False,
+        threaded=False
+    ):
+        """
+        Liaison which receives commands and sends responses over a websocket.
+
+        Parameters
+        ----------
+        host : str
+            Host to serve the websocket on, by default "localhost"
+        port : str
+            Port to serve the websocket on, by default "8001"
+        companion : Companion, optional
+            Companion to process commands with, one will be created if none given
+        strict : bool, optional
+            If True, validate every command against the full command schema, by default False
+        record_messages : bool, optional
+            If True, store every received message in `.messages`, by default False
+        threaded : bool, optional
+            If True, process commands on a separate worker thread so that slow commands don't 
+            hold up receiving messages. Off by default, as objects tied to the thread which 
+            created them (e.g. windows and GL contexts) need commands to run on the thread which 
+            called `.start()`.
+        """
+        BaseLiaison.__init__(self, companion, strict=strict, record_messages=record_messages)
         # store host and port
         self.host = host
         self.port = port
@@ -49,75 +148,159 @@ class WebsocketLiaison(BaseLiaison):
         self.com = None
         self.server = None
         # create an asynchronous loop
-        self.loop = asyncio.new_event_loop()
+        if uvloop is not None:
+            self.loop = uvloop.new_event_loop()
+        else:
+            self.loop = asyncio.new_event_loop()
         # stores whether this liaison is active
         self.alive = False
+        # should commands be processed on a worker thread?
+        self.threaded = threaded
+        # thread to process commands on, if threaded (created on connection)
+        self.executor = None
+    
+    def handle_message(self, message):
+        """
+        Parse a raw message, process the command in it and return the response as a JSON string.
+
+        Parameters
+        ----------
+        message : str
+            Raw message received over the websocket
+
+        Returns
+        -------
+        str or None
+            Response as a JSON string, or None if the message couldn't be parsed
+        """
+        # store message
+        if self.record_messages:
+            self.messages.append(message)
+        # parse it from JSON
+        try:
+            message = json.loads(message)
+        except json.JSONDecodeError as err:
+            LOG.exception("Could not parse message as JSON")
+            # store error as a message
+            if self.record_messages:
+                self.messages.append(err)
+            return
+        # process it
+        try:
+            resp = {
+                'response': self.process_command(message['command']),
+                'tag': RESPONSE_TAG,
+                'evt': message,
+            }
+        except Exception as err:
+            # send errors to the websocket
+            resp = {
+                'error': "".join(traceback.TracebackException.from_exception(err).format()),
+                'tag': ERROR_TAG,
+                'evt': message
+            }
+        # make sure resp is a JSON string
+        try:
+            resp = orjson.dumps(resp, default=_liaison_default, option=_ORJSON_OPTIONS).decode()
+        except orjson.JSONEncodeError:
+            # orjson can't encode everything json can (e.g. very large ints), so try that
+            try:
+                resp = _ENCODER.encode(resp)
+            except:
+                resp = str(resp)
+        
+        return resp
     
     def start(self):
-        async def process_messages(websocket):
-            # store websocket handle
-            self.com = websocket
-            # start off alive
-            self.alive = True
+        async def receive(websocket, incoming):
             # run until killed
             while self.alive:
                 try:
-                    # wait for a message
-                    message = await websocket.recv()
-                    # store message
-                    self.messages.append(message)
-                    # parse it from JSON
-                    message = json.loads(message)
-                    # process it
-                    try:
-                        resp = {
-                            'response': self.process_command(message['command']),
-                            'tag': "response",
-                            'evt': message,
-                        }
-                    except Exception as err:
-                        # send errors to the websocket
-                        resp = {
-                            'error': traceback.format_exception(err, err, err.__traceback__),
-                            'tag': "error",
-                            'evt': message
-                        }
-                    # make sure resp is a JSON string
-                    if not isinstance(resp, str):
-                        try:
-                            resp = json.dumps(resp, cls=LiaisonJSONEncoder)
-                        except:
-                            resp = str(resp)
-                    # send response
-                    await websocket.send(resp)
-                except json.JSONDecodeError as err:
-                    # send error
-                    for line in traceback.format_exception(err, err, err.__traceback__):
-                        sys.stdout.write(line)
-                    sys.stdout.flush()
-                    # store error as a message
-                    self.messages.append(err)
+                    # wait for a message and queue it for processing (waiting if queue is full)
+                    await incoming.put(await websocket.recv())
                 except (websockets.ConnectionClosedOK, websockets.ConnectionClosedError) as err:
-                    # send error
-                    for line in traceback.format_exception(err, err, err.__traceback__):
-                        sys.stdout.write(line)
-                    sys.stdout.flush()
+                    if isinstance(err, websockets.ConnectionClosedOK):
+                        # closing normally isn't an error, so no need for a traceback
+                        LOG.info("Websocket connection closed: %s", err)
+                    else:
+                        LOG.exception("Websocket connection closed unexpectedly")
                     # store end message / error as a message
-                    self.messages.append(err)
+                    if self.record_messages:
+                        self.messages.append(err)
                     # clear ref to websocket
                     self.com = None
                     # kill
                     self.stop()
-                except Exception as err:
-                    for line in traceback.format_exception(err, err, err.__traceback__):
-                        sys.stdout.write(line)
-                    sys.stdout.flush()
+                except Exception:
+                    LOG.exception("Error receiving message")
+        
+        async def work(incoming, outgoing, executor):
+            while True:
+                message = await incoming.get()
+                try:
+                    if executor is None:
+                        # parse, process and encode on this thread
+                        resp = self.handle_message(message)
+                    else:
+                        # parse, process and encode on the worker thread, so the loop stays free
+                        resp = await self.loop.run_in_executor(
+                            executor, self.handle_message, message
+                        )
+                except Exception:
+                    LOG.exception("Error processing message")
+                    continue
+                # queue response to be sent (waiting if queue is full)
+                if resp is not None:
+                    await outgoing.put(resp)
+        
+        async def transmit(websocket, outgoing):
+            while True:
+                # send responses as they're ready
+                try:
+                    await websocket.send(await outgoing.get())
+                except Exception:
+                    LOG.exception("Error sending response")
+        
+        async def process_messages(websocket):
+            # store websocket handle
+            self.com = websocket
+            # start off alive
+            self.alive = True
+            # if threaded, make a thread to process commands on (just one, so commands run in the 
+            # order received)
+            if self.threaded and self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1)
+            # queues for messages received and responses to send (bounded, so that a slow command 
+            # or a slow reader holds up receiving rather than filling memory)
+            incoming = asyncio.Queue(maxsize=self.MAX_QUEUE)
+            outgoing = asyncio.Queue(maxsize=self.MAX_QUEUE)
+            # start processing and sending in the background
+            tasks = [
+                asyncio.create_task(work(incoming, outgoing, self.executor)),
+                asyncio.create_task(transmit(websocket, outgoing)),
+            ]
+            # receive until killed
+            try:
+                await receive(websocket, incoming)
+            finally:
+                for task in tasks:
+                    task.cancel()
         
         async def run():
             # create future
             future = self.loop.create_future()
             # await future to continuously serve
-            async with websockets.serve(process_messages, self.host, self.port, compression=None) as self.server:
+            async with websockets.serve(
+                process_messages, self.host, self.port, 
+                compression=None,
+                # queue as many incoming messages as we'll queue for processing
+                max_queue=self.MAX_QUEUE,
+                # buffer up to 1MiB of outgoing data before waiting for it to drain
+                write_limit=2**20,
+                # keep pinging, but don't close connections which are busy with a long command
+                ping_interval=20,
+                ping_timeout=None,
+            ) as self.server:
                 # post start message in stdout
                 sys.stdout.write(f"{START_MARKER}@{self.host}:{self.port}")
                 sys.stdout.flush()
@@ -134,12 +317,16 @@ class WebsocketLiaison(BaseLiaison):
 
     def stop(self):
         self.alive = False
+        # shut down worker thread, if there is one
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
     
     def send(self, message, timeout=1):
         # make sure message is a JSON string
         if not isinstance(message, str):
             try:
-                message = json.dumps(message, cls=LiaisonJSONEncoder)
+                message = _ENCODER.encode(message)
             except:
                 message = str(message)
         # send
@@ -169,6 +356,6 @@ def send_message(liaison, message, timeout=1):
     """
     # make sure message is a JSON string
     if not isinstance(message, str):
-        message = json.dumps(message, cls=LiaisonJSONEncoder)
+        message = _ENCODER.encode(message)
     # send
     return liaison.send(message, timeout=timeout)
@@ -0,0 +1,60 @@
+import pytest
+from liaison.base import BaseLiaison
+
+
+class TestBaseLiaison:
+    def setup_method(self):
+        # create a liaison with and without strict validation
+        self.liaison = BaseLiaison()
+        self.strict_liaison = BaseLiaison(strict=True)
+    
+    def test_valid_command(self):
+        for liaison in (self.liaison, self.strict_liaison):
+            assert liaison.process_command({"command": "ping"}) == "pong"
+            assert liaison.process_command(
+                {"command": "run", "args": ["os.path:join", "a"], "kwargs": {}}
+            ) == "a"
+    
+    def test_strict_rejects_invalid(self):
+        # check that args which aren't an array are rejected
+        assert self.strict_liaison.process_command({"command": "ping", "args": "x"}) is None
+        # check that unknown commands are rejected
+        assert self.strict_liaison.process_command({"command": "not_a_command"}) is None
+        # check that a missing command name is rejected
+        assert self.strict_liaison.process_command({"args": []}) is None
+    
+    def test_non_strict_rejects_invalid(self):
+        # check that unknown commands return None
+        assert self.liaison.process_command({"command": "not_a_command"}) is None
+        # check that commands which aren't a dict or have no name return None
+        assert self.liaison.process_command(["ping"]) is None
+        assert self.liaison.process_command({"command": ["ping"]}) is None
+        # check that args/kwargs of the wrong type return None
+        assert self.liaison.process_command({"command": "ping", "args": "x"}) is None
+        assert self.liaison.process_command({"command": "ping", "kwargs": ["x"]}) is None
+    
+    def test_dispatch(self):
+        # check that commands added to the companion after creating the liaison can be used
+        self.liaison.companion.commands['custom'] = lambda value: value * 2
+        assert self.liaison.process_command({"command": "custom", "args": [2]}) == 4
+    
+    def test_max_messages(self):
+        class SmallLiaison(BaseLiaison):
+            MAX_MESSAGES = 2
+        liaison = SmallLiaison()
+        # check that only the most recent messages are kept
+        for n in range(5):
+            liaison.messages.append(n)
+        assert list(liaison.messages) == [3, 4]
+    
+    def test_command_validator(self):
+        import fastjsonschema
+        # check that valid commands pass validation
+        self.liaison.command_validator({"command": "run", "args": [], "kwargs": {}})
+        # check that invalid commands raise an error
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            self.liaison.command_validator({"command": "run", "kwargs": []})
+        # check that schema and validator are shared between liaisons, rather than made for each
+        assert self.liaison.command_schema is self.strict_liaison.command_schema
+        assert self.liaison.command_validator is self.strict_liaison.command_validator
+        assert "command" in self.liaison.command_schema['properties']
@@ -0,0 +1,127 @@
+import os
+import pytest
+import threading
+from liaison.companion import Companion
+
+
+class TestCompanion:
+    def setup_method(self):
+        # create a companion
+        self.companion = Companion()
+        # register a class and an instance of it
+        self.companion.register("TestClass", "tests.util.test_module:TestClass")
+        self.companion.initialize("test_instance", "TestClass", "value")
+    
+    def test_slots(self):
+        # check that companions don't have an instance dict
+        assert not hasattr(self.companion, "__dict__")
+        with pytest.raises(AttributeError):
+            self.companion.not_an_attribute = "value"
+    
+    def test_resolve(self):
+        from tests.util.test_module import TestClass
+        # check that a name in the namespace can be resolved
+        assert self.companion.resolve("TestClass") is TestClass
+        # check that attributes can be resolved
+        assert self.companion.resolve("test_instance.test_arg") == "value"
+        assert self.companion.resolve("test_instance.test_attribute") == "test"
+        # check that import strings can be resolved
+        assert self.companion.resolve("tests.util.test_module:TestClass") is TestClass
+        # check that expressions which aren't plain attributes can still be resolved
+        assert self.companion.resolve("test_instance.test_arg[0]") == "v"
+        assert self.companion.resolve("test_instance.test_arg.upper()") == "VALUE"
+        # check that missing attributes raise an error
+        with pytest.raises(AttributeError):
+            self.companion.resolve("test_instance.not_an_attribute")
+    
+    def test_actualize(self):
+        # check that $-prefixed strings are resolved
+        assert self.companion.actualize("$test_instance.test_arg") == "value"
+        assert self.companion.actualize("$TestClass.test_attribute") == "test"
+        # check that other values are returned unchanged
+        assert self.companion.actualize("test_instance.test_arg") == "test_instance.test_arg"
+        assert self.companion.actualize("$not valid") == "$not valid"
+        assert self.companion.actualize("$") == "$"
+        assert self.companion.actualize("") == ""
+        assert self.companion.actualize(1) == 1
+        assert self.companion.actualize(["$test_instance.test_arg"]) == ["$test_instance.test_arg"]
+    
+    def test_resolve_import(self):
+        from tests.util.test_module import test_function
+        # check that an import string resolves to the right object
+        assert Companion.resolve_import("tests.util.test_module:test_function") is test_function
+        # check that importing again gives the same object, from the cache
+        hits = Companion.resolve_import.cache_info().hits
+        assert self.companion.resolve_import("tests.util.test_module:test_function") is test_function
+        assert Companion.resolve_import.cache_info().hits == hits + 1
+        # check that invalid import strings still raise an error each time
+        for n in range(2):
+            with pytest.raises(AssertionError):
+                self.companion.resolve_import("not an import")
+    
+    def test_call(self):
+        self.companion.store("test_value", "stored")
+        # check that args and kwargs values are actualized
+        resp = self.companion.call(
+            "TestClass", "$test_value", test_kwarg="$test_instance.test_arg"
+        )
+        assert resp.test_arg == "stored"
+        assert resp.test_kwarg == "value"
+        # check that $-prefixed keys are actualized
+        self.companion.store("test_key", "test_kwarg")
+        resp = self.companion.call("TestClass", "value", **{"$test_key": "key"})
+        assert resp.test_kwarg == "key"
+        # check that many args are all actualized and passed in order
+        resp = self.companion.call("os.path:join", "a", "$test_value", "b")
+        assert resp == os.path.join("a", "stored", "b")
+        resp = self.companion.call("builtins:max", 1, "$test_instance.test_arg", 3, key=str)
+        assert resp == "value"
+    
+    def test_cache_resolved(self):
+        self.companion.store("test_value", "outer")
+        with self.companion.cache_resolved():
+            # check that resolved values are reused within the context
+            assert self.companion.resolve("test_value") == "outer"
+            self.companion.store("test_value", "changed")
+            assert self.companion.resolve("test_value") == "outer"
+            # check that other threads don't use the cache
+            result = []
+            thread = threading.Thread(
+                target=lambda: result.append(self.companion.resolve("test_value"))
+            )
+            thread.start()
+            thread.join()
+            assert result == ["changed"]
+            # check that a nested context gets its own cache
+            with self.companion.cache_resolved():
+                assert self.companion.resolve("test_value") == "changed"
+                self.companion.store("test_value", "inner")
+            # check that the outer cache is restored after the nested context
+            assert self.companion.resolve("test_value") == "outer"
+        # check that nothing is cached after the context
+        assert self.companion.resolve("test_value") == "inner"
+    
+    def test_cache_resolved_in_command(self, monkeypatch):
+        from liaison.base import BaseLiaison
+        liaison = BaseLiaison(companion=self.companion)
+        self.companion.store("test_value", "stored")
+        self.companion.register("test_function", "tests.util.test_module:test_function")
+        # keep track of which targets are actually resolved
+        resolved = []
+        resolve_uncached = Companion._resolve_uncached
+
+        def spy(companion, target, root):
+            resolved.append(target)
+            return resolve_uncached(companion, target, root)
+        
+        monkeypatch.setattr(Companion, "_resolve_uncached", spy)
+        # check that a value repeated within a command is only resolved once
+        resp = liaison.process_command({
+            "command": "run",
+            "args": ["test_function", "$test_value"],
+            "kwargs": {"test_kwarg": "$test_value"},
+        })
+        assert resp == ("stored", "stored")
+        assert resolved.count("test_value") == 1
+        # check that the cache is cleared after the command
+        assert getattr(self.companion._local, "resolve_cache", None) is None
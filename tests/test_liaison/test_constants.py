@@ -0,0 +1,19 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from liaison import constants
+
+
+def test_constants_module():
+    # check that running the constants module prints all constants as JSON
+    output = subprocess.run(
+        [sys.executable, "-m", "liaison.constants"], 
+        cwd=Path(__file__).parent.parent.parent, capture_output=True, check=True
+    ).stdout
+    assert json.loads(output) == {
+        "START_MARKER": constants.START_MARKER,
+        "STOP_MARKER": constants.STOP_MARKER,
+        "RESPONSE_TAG": constants.RESPONSE_TAG,
+        "ERROR_TAG": constants.ERROR_TAG,
+    }
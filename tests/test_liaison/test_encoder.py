@@ -0,0 +1,50 @@
+import json
+import os
+from liaison.websocket.websocket import LiaisonJSONEncoder, _converters
+
+
+class TestLiaisonJSONEncoder:
+    def encode(self, value):
+        return json.loads(json.dumps(value, cls=LiaisonJSONEncoder))
+    
+    def test_getJSON(self):
+        class HasGetJSON:
+            def getJSON(self):
+                return "from class"
+        # check that a getJSON method on the class is used
+        assert self.encode(HasGetJSON()) == "from class"
+        # check that a getJSON method set on an instance is used
+        obj = object.__new__(type("NoGetJSON", (), {}))
+        obj.getJSON = lambda: "from instance"
+        assert self.encode(obj) == "from instance"
+        # check that a getJSON method provided by __getattr__ is used
+        class Proxy:
+            def __getattr__(self, name):
+                if name == "getJSON":
+                    return lambda: "from proxy"
+                raise AttributeError(name)
+        assert self.encode(Proxy()) == "from proxy"
+        # check that a broken getJSON method falls back to regular conversion
+        class BrokenGetJSON:
+            def getJSON(self):
+                raise ValueError()
+            
+            def __str__(self):
+                return "from str"
+        assert self.encode(BrokenGetJSON()) == "from str"
+    
+    def test_converter_cache(self):
+        class Unencodable:
+            def __str__(self):
+                return "from str"
+        # check that objects are converted and their type's converter cached
+        assert self.encode(Unencodable()) == "from str"
+        assert _converters[Unencodable] is str
+        assert self.encode(os) == "python:///os"
+        assert self.encode(os.path.join) == f"python:///{os.path.__name__}:join"
+        assert self.encode(ValueError("test")) == ["ValueError: test\n"]
+        # check that cached converter is reused, but getJSON is still checked per object
+        obj = Unencodable()
+        obj.getJSON = lambda: "from instance"
+        assert self.encode(obj) == "from instance"
+        assert self.encode(Unencodable()) == "from str"
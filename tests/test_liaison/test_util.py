@@ -0,0 +1,18 @@
+import sys
+import pytest
+from liaison.util import lazy_import
+
+
+def test_lazy_import():
+    from tests import util
+    # check that lazily importing a module doesn't load it
+    module = lazy_import("tests.util.lazy_module")
+    assert not getattr(util, "lazy_module_loaded", False)
+    # check that accessing an attribute loads it
+    assert module.TEST_CONSTANT == "test"
+    assert util.lazy_module_loaded
+    # check that lazily importing an already imported module returns it
+    assert lazy_import("tests.util.lazy_module") is sys.modules["tests.util.lazy_module"]
+    # check that a missing module still errors straight away
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("not_a_module")
@@ -0,0 +1,169 @@
+import json
+import logging
+import pytest
+import time
+from threading import Thread
+from websockets.sync.client import connect
+from liaison.websocket import WebsocketLiaison
+from liaison.constants import RESPONSE_TAG, ERROR_TAG
+
+
+def start_liaison(**kwargs):
+    """
+    Start a WebsocketLiaison on a free port in a separate thread (named "StartThread"), returning 
+    it along with the address to connect to it at.
+    """
+    liaison = WebsocketLiaison(host="localhost", port=0, **kwargs)
+    Thread(target=liaison.start, daemon=True, name="StartThread").start()
+    # wait for the server to start
+    for n in range(100):
+        if liaison.server is not None:
+            break
+        time.sleep(0.05)
+    port = liaison.server.sockets[0].getsockname()[1]
+
+    return liaison, f"ws://localhost:{port}"
+
+
+def run_commands(address, *commands):
+    """
+    Send each command to a liaison over a new connection and return the responses.
+    """
+    with connect(address) as websocket:
+        for command in commands:
+            websocket.send(json.dumps({"command": command}))
+        return [json.loads(websocket.recv(timeout=5)) for command in commands]
+
+
+class TestHandleMessage:
+    def setup_method(self):
+        # create a websocket liaison (without starting it)
+        self.liaison = WebsocketLiaison(
+            host="localhost",
+            port="8001"
+        )
+    
+    def test_response(self):
+        message = {"command": {"command": "ping"}, "id": "abc"}
+        resp = json.loads(self.liaison.handle_message(json.dumps(message)))
+        # check that the response is tagged as a response and contains the output
+        assert resp['tag'] == RESPONSE_TAG
+        assert resp['response'] == "pong"
+        # check that the original message is returned with it
+        assert resp['evt'] == message
+    
+    def test_error(self):
+        message = {"command": {"command": "run", "args": ["os.path:not_a_function"]}}
+        resp = json.loads(self.liaison.handle_message(json.dumps(message)))
+        # check that the response is tagged as an error and contains the traceback
+        assert resp['tag'] == ERROR_TAG
+        assert isinstance(resp['error'], str)
+        assert resp['error'].startswith("Traceback (most recent call last):")
+        assert "AttributeError" in resp['error']
+        assert resp['evt'] == message
+    
+    def test_loop(self):
+        # check that uvloop is used for the event loop if installed
+        uvloop = pytest.importorskip("uvloop")
+        assert isinstance(self.liaison.loop, uvloop.Loop)
+    
+    def test_unparseable(self, caplog):
+        # check that nothing is sent back for a message which isn't JSON
+        assert self.liaison.handle_message("not json") is None
+        # check that the error is logged
+        assert "Could not parse message as JSON" in caplog.text
+        # check that nothing is stored by default
+        assert not self.liaison.messages
+        # check that the message and error are stored if recording messages
+        liaison = WebsocketLiaison(host="localhost", port="8001", record_messages=True)
+        assert liaison.handle_message("not json") is None
+        assert list(liaison.messages)[0] == "not json"
+        assert isinstance(list(liaison.messages)[1], json.JSONDecodeError)
+    
+    def run(self, *args):
+        # run a function via handle_message and return the parsed response
+        message = json.dumps({"command": {"command": "run", "args": list(args)}})
+        return json.loads(self.liaison.handle_message(message))['response']
+    
+    def test_exact_numbers(self):
+        # check that numbers too big for orjson keep their exact value
+        assert self.run("builtins:str", 10**30) == str(10**30)
+        # check that values only json can parse are still accepted
+        assert self.run("builtins:str", float("nan")) == "nan"
+        assert self.run("builtins:str", float("inf")) == "inf"
+    
+    def test_encoding_fallback(self):
+        # check that values orjson can't encode are still sent as valid JSON
+        assert self.run("builtins:int", "1" * 30) == int("1" * 30)
+    
+    def test_encoding_like_json(self):
+        # check that tuple subclasses are sent as arrays
+        assert self.run("time:gmtime", 0)[:3] == [1970, 1, 1]
+        assert isinstance(self.run("os:stat", "."), list)
+        # check that float subclasses are sent as numbers
+        assert self.run("tests.util.test_module:TestFloat", 1.5) == 1.5
+        # check that dataclasses and datetimes go through the same conversion as json would
+        assert self.run("datetime:date", 2000, 1, 1) == "2000-01-01"
+        assert self.run("tests.util.test_module:TestDataclass") == "from getJSON"
+
+
+class TestPipeline:
+    def test_thread(self):
+        get_thread = {"command": "run", "args": ["threading:current_thread"]}
+        # check that commands run on the thread which started the liaison by default
+        liaison, address = start_liaison()
+        resp, = run_commands(address, get_thread)
+        assert "StartThread" in resp['response']
+        # check that commands run on a worker thread if threaded
+        liaison, address = start_liaison(threaded=True)
+        resp, = run_commands(address, get_thread)
+        assert "StartThread" not in resp['response']
+        liaison.stop()
+    
+    def test_order(self):
+        liaison, address = start_liaison(threaded=True)
+        # check that responses come back in the order commands were sent, even if slow
+        resp = run_commands(
+            address,
+            {"command": "run", "args": ["time:sleep", 0.2]},
+            {"command": "ping"},
+        )
+        assert [r['evt']['command']['command'] for r in resp] == ["run", "ping"]
+        liaison.stop()
+    
+    def test_reconnect(self):
+        liaison, address = start_liaison(threaded=True)
+        # check that the worker thread is shut down when the connection closes...
+        run_commands(address, {"command": "ping"})
+        for n in range(100):
+            if liaison.executor is None:
+                break
+            time.sleep(0.05)
+        assert liaison.executor is None
+        # ...and started again for the next connection
+        resp, = run_commands(address, {"command": "ping"})
+        assert resp['response'] == "pong"
+        liaison.stop()
+    
+    def test_close(self, caplog):
+        caplog.set_level(logging.INFO, logger="liaison.websocket.websocket")
+        liaison, address = start_liaison()
+        run_commands(address, {"command": "ping"})
+        # wait for the liaison to notice the connection has closed
+        for n in range(100):
+            if not liaison.alive:
+                break
+            time.sleep(0.05)
+        # check that closing normally is logged as info, not as an error
+        assert "Websocket connection closed" in caplog.text
+        assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+    
+    def test_burst(self):
+        liaison, address = start_liaison()
+        # check that more messages than can be queued at once all get a response
+        n = WebsocketLiaison.MAX_QUEUE * 3
+        with connect(address) as websocket:
+            for i in range(n):
+                websocket.send(json.dumps({"command": {"command": "ping"}, "id": i}))
+            ids = [json.loads(websocket.recv(timeout=5))['evt']['id'] for i in range(n)]
+        assert ids == list(range(n))
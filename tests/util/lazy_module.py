@@ -0,0 +1,7 @@
+from tests import util
+
+
+# record that this module has been loaded
+util.lazy_module_loaded = True
+
+TEST_CONSTANT = "test"
@@ -1 +1 @@
-from .test_submodule import TestClass, test_function, TEST_CONSTANT
\ No newline at end of file
+from .test_submodule import TestClass, TestDataclass, TestFloat, test_function, TEST_CONSTANT
\ No newline at end of file
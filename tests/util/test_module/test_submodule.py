@@ -1,3 +1,6 @@
+import dataclasses
+
+
 class TestClass:
     test_attribute = "test"
     
@@ -14,3 +17,15 @@ def test_function(test_arg, test_kwarg="test"):
 
 
 TEST_CONSTANT = "test"
+
+
+@dataclasses.dataclass
+class TestDataclass:
+    test_attribute: str = "test"
+
+    def getJSON(self):
+        return "from getJSON"
+
+
+class TestFloat(float):
+    pass